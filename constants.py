@@ -4,29 +4,16 @@ from pathlib import Path
 _THIS_DIR = Path(__file__).resolve().parent
 CONSTANTS_DIR = _THIS_DIR / "constants_data"
 
-# Load .npy files
-_CARD_RANK_MASKS = numpy.load(CONSTANTS_DIR / "card_rank_masks.npy", allow_pickle=False)
-_CARD_SYMBOL_MASKS = numpy.load(CONSTANTS_DIR / "card_symbol_masks.npy", allow_pickle=False)
+# Load bit-packed masks (N, ceil(H*W/8)) used for template matching (see tools/pack_masks.py)
+with numpy.load(CONSTANTS_DIR / "card_rank_masks.npz", allow_pickle=False) as _data:
+    _CARD_RANK_MASKS_PACKED = _data["packed"]
+    _CARD_RANK_MASKS_SHAPE = tuple(int(dim) for dim in _data["shape"])  # (N, H, W)
 
-_RANK_INDICES_MAPPING = {
-    0: 'A',
-    1: '2',
-    2: '3',
-    3: '4',
-    4: '5',
-    5: '6',
-    6: '7',
-    7: '8',
-    8: '9',
-    9: '10',
-    10: 'J',
-    11: 'Q',
-    12: 'K'
-}
+with numpy.load(CONSTANTS_DIR / "card_symbol_masks.npz", allow_pickle=False) as _data:
+    _CARD_SYMBOL_MASKS_PACKED = _data["packed"]
+    _CARD_SYMBOL_MASKS_SHAPE = tuple(int(dim) for dim in _data["shape"])  # (N, H, W)
 
-_SYMBOL_INDICES_MAPPING = {
-    0: '♦',
-    1: '♠',
-    2: '♣',
-    3: '♥'
-}
+# Template index -> card rank / suit (indices are dense, from 0 to N - 1)
+_RANK_INDICES_MAPPING = ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K')
+
+_SYMBOL_INDICES_MAPPING = ('♦', '♠', '♣', '♥')
@@ -1,25 +1,220 @@
-from openai import OpenAI
+import os
+import json
+import asyncio
+from abc import ABC, abstractmethod
+from jiter import from_json
+from openai import AsyncOpenAI
+from openai.types.shared_params import ResponseFormatJSONSchema
+from typing import Any, AsyncIterator, Callable, Optional
 
-def run_gpt_completion(client: OpenAI, system_prompt: str, user_prompt: str) -> str:
+_DEFAULT_GPT_MODEL = "gpt-4o-mini" # Must support structured outputs (e.g. "gpt-4o" for a stronger model)
+_MOVES = ("Fold", "Call", "Raise")
+
+# JSON schema of the reply: the move and its justification only
+_RECOMMENDATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "action": {"type": "string", "enum": list(_MOVES)},
+        "justification": {"type": "string"}
+    },
+    "required": ["action", "justification"],
+    "additionalProperties": False
+}
+
+# Structured output format, as expected by the OpenAI API
+_RECOMMENDATION_FORMAT: ResponseFormatJSONSchema = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "move_recommendation",
+        "strict": True,
+        "schema": _RECOMMENDATION_SCHEMA
+    }
+}
+
+def format_recommendation(recommendation: dict[str, str]) -> str:
+    """
+    Formats a structured recommendation into the French text displayed to the user.
+
+    Partial recommendations (received while streaming) are supported: the move line
+    is only added once the action is complete, and the justification as far as received.
+
+    Args:
+        recommendation (dict[str, str]): The (possibly partial) reply with 'action'
+            and 'justification' keys.
+
+    Returns:
+        str: The recommendation text, e.g. '→ Je recommande de Raise.' followed by
+             a blank line and the justification.
+    """
+    text = ""
+    action = recommendation.get("action")
+    if action in _MOVES:
+        text = f"→ Je recommande de {action}."
+    justification = recommendation.get("justification")
+    if justification:
+        text += f"\n\n{justification}"
+    return text
+
+# === Backends ===
+
+class LLMBackend(ABC):
+    """
+    Base class of the language model backends answering the poker prompts.
+
+    A backend streams the raw JSON reply (see `_RECOMMENDATION_SCHEMA`); parsing and
+    formatting are shared by all backends in `run_gpt_completion`.
+    """
+    @abstractmethod
+    def stream_reply(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """
+        Streams the raw JSON reply of the model, piece by piece.
+
+        Args:
+            system_prompt (str): System-level instructions for the assistant.
+            user_prompt (str): The user's message to the assistant.
+
+        Returns:
+            AsyncIterator[str]: The successive pieces of the JSON reply.
+        """
+
+class OpenAIBackend(LLMBackend):
+    """
+    Backend querying an OpenAI model through the API.
     """
-    Runs a GPT-4 chat completion with a system and user prompt.
+    def __init__(self, client: AsyncOpenAI, model: str = _DEFAULT_GPT_MODEL) -> None:
+        """
+        Initializes the OpenAI backend.
+
+        Args:
+            client (AsyncOpenAI): An instance of the asynchronous OpenAI client.
+            model (str): Name of the OpenAI model to use. It must support structured outputs.
+        """
+        self.client = client
+        self.model = model
+
+    async def stream_reply(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """
+        Streams the raw JSON reply of the OpenAI model, piece by piece.
+
+        Args:
+            system_prompt (str): System-level instructions for the assistant.
+            user_prompt (str): The user's message to the assistant.
+
+        Yields:
+            str: The successive pieces of the JSON reply.
+        """
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.3,
+            response_format=_RECOMMENDATION_FORMAT,
+            stream=True
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+class LlamaCppBackend(LLMBackend):
+    """
+    Backend running a local quantized model (GGUF file, e.g. a Q4_K_M 7B model) with llama.cpp.
+
+    It removes the network round trip to the OpenAI API. Requires the optional
+    `llama-cpp-python` package.
+    """
+    def __init__(self, 
+                 model_path: str, 
+                 n_ctx: int = 2048, 
+                 n_gpu_layers: int = -1, 
+                 max_tokens: int = 256) -> None:
+        """
+        Loads the local model.
+
+        Args:
+            model_path (str): Path of the GGUF model file.
+            n_ctx (int): Context size, in tokens. Defaults to 2048.
+            n_gpu_layers (int): Number of layers offloaded to the GPU (-1 for all of them). Defaults to -1.
+            max_tokens (int): Maximum number of tokens of a reply. Defaults to 256.
+        """
+        from llama_cpp import Llama # optional dependency, only needed for local inference
+
+        self.llm = Llama(model_path=model_path,
+                         n_ctx=n_ctx,
+                         n_threads=os.cpu_count(),
+                         n_gpu_layers=n_gpu_layers,
+                         verbose=False)
+        self.max_tokens = max_tokens
+
+    async def stream_reply(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """
+        Streams the raw JSON reply of the local model, piece by piece.
+
+        Generation is blocking, so each piece is produced in a worker thread to keep
+        the event loop free. The reply is constrained to the JSON schema by a grammar.
+
+        Args:
+            system_prompt (str): System-level instructions for the assistant.
+            user_prompt (str): The user's message to the assistant.
+
+        Yields:
+            str: The successive pieces of the JSON reply.
+        """
+        stream: Any = self.llm.create_chat_completion(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.3,
+            max_tokens=self.max_tokens,
+            response_format={"type": "json_object", "schema": _RECOMMENDATION_SCHEMA},
+            stream=True
+        )
+        while True:
+            chunk = await asyncio.to_thread(next, stream, None)
+            if chunk is None:
+                break
+            delta = chunk["choices"][0]["delta"].get("content")
+            if delta:
+                yield delta
+
+# === Completion ===
+
+async def run_gpt_completion(backend: LLMBackend,
+                             system_prompt: str,
+                             user_prompt: str,
+                             on_delta: Optional[Callable[[str], None]] = None) -> str:
+    """
+    Runs a chat completion with a system and user prompt, and formats its structured reply.
+
+    The completion is streamed so that the beginning of the reply is available
+    as soon as the first tokens arrive, instead of waiting for the full response.
+    The reply is constrained to a JSON object holding the action and its justification.
+    Being a coroutine, several completions can share a client's connection concurrently.
 
     Args:
-        client (OpenAI): An instance of the OpenAI client.
+        backend (LLMBackend): The language model backend answering the prompt.
         system_prompt (str): System-level instructions for the assistant.
         user_prompt (str): The user's message to the assistant.
+        on_delta (Callable[[str], None] | None): Optional callback invoked with the formatted
+            reply received so far, each time a new piece of it is streamed.
 
     Returns:
-        str: The assistant's generated reply.
-    """
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        temperature=0.3
-    )
-    response_message = response.choices[0].message.content
-    assert isinstance(response_message, str), "GPT response message should never be None."
-    return response_message
+        str: The assistant's formatted reply.
+    """
+    raw_reply = ""
+    async for delta in backend.stream_reply(system_prompt, user_prompt):
+        raw_reply += delta
+        if on_delta is not None:
+            try:
+                partial_reply = from_json(raw_reply.encode(), partial_mode="trailing-strings")
+            except ValueError:
+                continue # Prefix not parsable yet (e.g. leading whitespace only)
+            partial_text = format_recommendation(partial_reply)
+            if partial_text:
+                on_delta(partial_text)
+    return format_recommendation(json.loads(raw_reply))
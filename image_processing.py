@@ -1,83 +1,164 @@
 import numpy
+from functools import lru_cache
 from numpy.typing import NDArray 
+from typing import Optional
 
-def find_best_match(input_mask: NDArray[numpy.bool_], 
-                    reference_masks: NDArray[numpy.bool_]
-                    ) -> tuple[int, int]:
+from utils_numba import count_in_box, match_rgb_ink, text_span_in_box
+
+_NO_ROW_LIMITS = numpy.empty(0, dtype=numpy.intp) # no pixel left blank by the diagonal mask
+
+def pack_words(packed: NDArray[numpy.uint8]) -> NDArray[numpy.uint64]:
     """
-    Compares an input boolean mask (H, W) to a batch of reference masks (N, H, W),
-    and returns the index of the best match based on pixel mismatch.
+    Regroups bit-packed masks into 64-bit words, so that they are compared 64 pixels at a time.
+
+    Each row is zero-padded to a multiple of 8 bytes and viewed as uint64. The padding
+    holds no pixel, so Hamming distances and pixel counts are unchanged.
 
     Args:
-        input_mask: A 2D boolean array of shape (H, W).
-        reference_masks: A 3D boolean array of shape (N, H, W).
+        packed: A 2D uint8 array of shape (N, B), each row holding one mask packed with `numpy.packbits`.
 
     Returns:
-        A tuple (best_index, mismatch_count) where:
-            - best_index_int is the index of the reference mask with the fewest mismatches.
-            - mismatch_count_int is the number of differing pixels.
+        A 2D uint64 array of shape (N, ceil(B / 8)).
     """
-    mismatches = input_mask != reference_masks  # Shape: (N, H, W)
-    mismatch_counts = mismatches.sum(axis=(1, 2))  # Shape: (N,)
-    best_index = numpy.argmin(mismatch_counts)
-    best_score = mismatch_counts[best_index]
-    best_index_int = int(best_index)
-    best_score_int = int(best_score) 
-    return best_index_int, best_score_int
-
-def to_ink_mask(arr: NDArray[numpy.float64], 
-                threshold: int = 0
-                ) -> NDArray[numpy.bool_]:
+    n_bytes = -(-packed.shape[1] // 8) * 8
+    padded = numpy.zeros((packed.shape[0], n_bytes), dtype=numpy.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view(numpy.uint64)
+
+def count_mask_pixels(reference_packed: NDArray[numpy.unsignedinteger]) -> NDArray[numpy.intp]:
     """
-    Converts an image array (grayscale or RGB) into a binary ink mask.
+    Counts the set pixels of each bit-packed mask.
 
-    Pixels greater than the given threshold are marked as ink (True), others as background (False).
-    RGB inputs are converted to grayscale via channel summation.
+    Args:
+        reference_packed: A 2D array of shape (N, B), packed in bytes or in 64-bit words.
+
+    Returns:
+        A 1D integer array of shape (N,).
+    """
+    return numpy.add.reduce(numpy.bitwise_count(reference_packed), axis=1, dtype=numpy.intp)
+
+def has_enough_color(arr: NDArray[numpy.uint8],
+                     lower: tuple[int, int, int],
+                     upper: tuple[int, int, int],
+                     threshold: int,
+                     stride: int = 1) -> bool:
+    """
+    Checks whether more than `threshold` pixels of an RGB image lie in a color box.
+
+    The channel comparisons and the count are fused in a jitted kernel, which stops
+    scanning as soon as the threshold is exceeded. With a stride greater than 1, only
+    one pixel out of `stride` is sampled along each axis, and the threshold is scaled
+    down accordingly.
 
     Args:
-        arr (NDArray): Input image array of shape (H, W) or (H, W, 3).
-        threshold (int): Pixel intensity threshold. Defaults to 0.
+        arr (NDArray[numpy.uint8]): Image array of shape (H, W, 3).
+        lower (tuple[int, int, int]): Inclusive lower (R, G, B) bounds of the box.
+        upper (tuple[int, int, int]): Inclusive upper (R, G, B) bounds of the box.
+        threshold (int): Number of pixels the count must exceed, at full resolution.
+        stride (int): Sampling step along both axes. Defaults to 1 (every pixel).
 
     Returns:
-        NDArray[numpy.bool_]: A 2D boolean mask where True indicates ink regions.
+        bool: True if more than `threshold` pixels are in the box, False otherwise.
     """
-    if arr.ndim == 3 and arr.shape[2] == 3:
-        arr = arr.sum(axis=2) # collapsed 3D into 2D array
-        
-    return arr > threshold
-
-def apply_diagonal_mask_top_left(arr: NDArray[numpy.float64],
-                                 strength: float = 0.3
-                                ) -> NDArray[numpy.float64]:
+    if stride > 1:
+        arr = arr[::stride, ::stride]
+        threshold //= stride * stride
+
+    count = count_in_box(arr,
+                         lower[0], upper[0],
+                         lower[1], upper[1],
+                         lower[2], upper[2],
+                         threshold)
+    return count > threshold
+
+def crop_to_text(arr: NDArray[numpy.uint8],
+                 lower: tuple[int, int, int],
+                 upper: tuple[int, int, int],
+                 max_gap: int,
+                 margin: int) -> NDArray[numpy.uint8]:
     """
-    Applies a diagonal top-left corner mask to a 2D or 3D image array.
+    Narrows an RGB image to the columns of its line of text, identified by its color box.
 
-    A triangular region in the top-left is masked out (multiplied by zero) using
-    a diagonal mask scaled by the `strength` parameter. This is useful for
-    ignoring irrelevant parts changing accross cards while they should be ignored
-    for the sake of template matching.
+    The text is the widest group of columns containing pixels in the box (see `text_span_in_box`),
+    so that small marks of the same color away from it (e.g. a turn timer) are left out.
 
     Args:
-        arr (NDArray[numpy.float64]): Input image array of shape (H, W) or (H, W, 3).
-        strength (float): Proportion (0 < strength < 1) of the image to mask diagonally.
+        arr (NDArray[numpy.uint8]): Image array of shape (H, W, 3).
+        lower (tuple[int, int, int]): Inclusive lower (R, G, B) bounds of the text color.
+        upper (tuple[int, int, int]): Inclusive upper (R, G, B) bounds of the text color.
+        max_gap (int): Largest number of consecutive columns without text inside the line
+                       (e.g. the space between a value and its unit).
+        margin (int): Number of columns kept on each side of the text.
 
     Returns:
-        NDArray[numpy.float64]: The masked array, same shape and dtype as input.
+        NDArray[numpy.uint8]: A view on the text columns of `arr`, or `arr` itself if no pixel is in the box.
     """
-    h, w = arr.shape[:2]
+    start, stop = text_span_in_box(arr,
+                                   lower[0], upper[0],
+                                   lower[1], upper[1],
+                                   lower[2], upper[2],
+                                   max_gap)
+    if start == stop:
+        return arr
+
+    return arr[:, max(start - margin, 0):stop + margin]
+
+@lru_cache(maxsize=16)
+def _diagonal_row_limits(h: int, w: int, strength_q: int) -> NDArray[numpy.intp]:
+    """
+    Computes, for each row of the top-left triangle, the number of pixels to mask.
+
+    Card crops have a fixed size for a given layout, so the result is cached and
+    computed only once per (h, w, strength) combination.
+
+    Args:
+        h (int): Image height.
+        w (int): Image width.
+        strength_q (int): Masking strength scaled by 1000 (so that it is a stable cache key).
+
+    Returns:
+        NDArray[numpy.intp]: Read-only array of shape (max_y,), where row y is masked up to column row_limits[y].
+    """
+    strength = strength_q / 1000
     max_x = int(w * strength)
     max_y = int(h * strength)
 
-    mask = numpy.ones((h, w), dtype=numpy.uint8)
+    row_limits = numpy.array([max_x - int((max_x / max_y) * y) for y in range(max_y)], dtype=numpy.intp)
+    row_limits.setflags(write=False) # shared between calls through the cache
+    return row_limits
 
-    for y in range(max_y):
-        x_limit = max_x - int((max_x / max_y) * y)
-        mask[y, :x_limit] = 0
+def find_best_ink_match(arr: NDArray[numpy.uint8],
+                        threshold: int,
+                        reference_packed: NDArray[numpy.unsignedinteger],
+                        reference_counts: NDArray[numpy.intp],
+                        diagonal_strength: Optional[float] = None
+                        ) -> tuple[int, int]:
+    """
+    Finds the reference mask closest to the ink mask of an RGB image.
+
+    Pixels whose channel sum is greater than the threshold are ink. The ink mask is packed
+    with the bit layout of `numpy.packbits`, and compared to the references by counting
+    mismatching pixels, in a single jitted call: the crop is neither copied nor turned into
+    an intermediate boolean mask.
+
+    Args:
+        arr (NDArray[numpy.uint8]): Image array of shape (H, W, 3).
+        threshold (int): Pixels whose channel sum is greater than it are ink.
+        reference_packed (NDArray): Packed reference masks of shape (N, B), in bytes or
+                                    in 64-bit words (see `pack_words`).
+        reference_counts (NDArray[numpy.intp]): Number of set pixels of each reference mask,
+                                                as returned by `count_mask_pixels`.
+        diagonal_strength (float | None): If set, proportion (0 < strength < 1) of the width and height
+                                          of the image covered by its ignored top-left triangle.
+                                          Defaults to None.
+
+    Returns:
+        tuple[int, int]: The index of the best matching reference, and its number of mismatching pixels.
+    """
+    if diagonal_strength is None:
+        row_limits = _NO_ROW_LIMITS
+    else:
+        h, w = arr.shape[:2]
+        row_limits = _diagonal_row_limits(h, w, round(diagonal_strength * 1000))
 
-    # Apply mask
-    if arr.ndim == 3:  # RGB image
-        expanded_mask = mask[:, :, None]  # Broadcast over channels
-        arr_masked: NDArray[numpy.float64] = arr * expanded_mask
-    else: # grayscale image
-        arr_masked = arr * mask
-    return arr_masked
\ No newline at end of file
+    return match_rgb_ink(arr, threshold, row_limits, reference_packed, reference_counts)
@@ -1,25 +1,39 @@
 
 import sys
+import asyncio
+import ctypes
 import pyautogui
+import torch
+from concurrent.futures import Future
+from itertools import chain
 from threading import Thread
 from pynput import keyboard
 from PyQt5.QtWidgets import QApplication, QWidget, QTextEdit, QVBoxLayout
 from PyQt5.QtGui import QFont, QCloseEvent
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject, QThread
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject, QRunnable, QThreadPool
+import httpx
 import openai
-from openai import OpenAI
-import easyocr
 from easyocr import Reader
 from PIL.Image import Image
 from typing import Union, Optional
 
-from gpt_interface import run_gpt_completion
+from gpt_interface import LLMBackend, LlamaCppBackend, OpenAIBackend, run_gpt_completion
+from ocr_interface import create_ocr_reader
 from prepare_data import PokerState
 
 # === OpenAI API ===
 _OPENAI_KEY = 'my_openai_key' # Replace with your actual key
+_OPENAI_TIMEOUT = 30.0 # seconds
+_KEEPALIVE_EXPIRY = 120.0 # seconds an idle connection is kept open between two analyses
 
-# NOTE: yo ucan modify the prompt below such as to skip the justification part,
+# === Local model ===
+_LLAMA_MODEL_PATH: Optional[str] = None # Path of a local GGUF model to run with llama.cpp instead of the OpenAI API
+
+# === Screen capture ===
+_WDA_EXCLUDEFROMCAPTURE = 0x11 # Windows display affinity hiding a window from captures (Windows 10 2004+)
+_HIDE_DELAY_MS = 200 # time given to the window to disappear when it has to be hidden before a capture
+
+# NOTE: yo ucan modify the prompt below such as to ask for an empty justification,
 # jumping directly to the answer. It makes OpenAI API answer much faster, but
 # you will get only the recommended move, not the reasons behind it.
 
@@ -48,114 +62,94 @@ initial_instruction = {
         "**Your task:**\n"
         "- Analyze the full poker situation based solely on the data\n"
         "- Recommend the **best move for Player 1 (the hero)**: **Fold**, **Call**, or **Raise**\n"
-        "- Your response must be **a single line in FRENCH**, clearly stating the recommended move. "
-        "- Add on a newline, after a blank space, a sound explanation for the recommanded move (in french) mentionning precisely the elements"
-        "you base your decision on."
-        "Only the action itself should be in English (Fold, Call, Raise).\n"
-        "- Do **not** include explanation, reasoning, or summary.\n"
+        "- Reply with a JSON object holding two fields:\n"
+        "  - `action`: the recommended move, in English (`Fold`, `Call` or `Raise`)\n"
+        "  - `justification`: a sound explanation for the recommended move, **in FRENCH**, mentionning precisely "
+        "the elements you base your decision on\n"
         "- Use **only** the given structured input. Do not make assumptions beyond it.\n\n"
         "**Example output:**\n"
-        "→ Je recommande de Raise.\n"
+        "{\"action\": \"Raise\", \"justification\": \"...\"}\n"
     )
 }
 
-# === Worker Threads ===
+# === Communicator ===
 
-class GPTWorker(QThread):
+class Communicator(QObject):
     """
-    Worker thread for running GPT completions without blocking the main UI thread.
+    A communication helper class to emit signals between threads and GUI components.
 
-    Emits:
-        finished (str): Emitted with the GPT response or an error message once the run is complete.
+    Signals:
+        update_text (str): Emitted when text needs to be updated in the GUI.
+        trigger_screenshot (): Emitted to signal that a screenshot should be taken.
+        ocr_finished (PokerState | None, str): Emitted by OCRTask with the parsed PokerState 
+                                               object and prompt, or error message.
+        gpt_partial (str): Emitted with the GPT reply received so far, each time a new piece is streamed.
+        gpt_finished (str): Emitted with the GPT response or an error message once the request is complete.
     """
-    finished = pyqtSignal(str)
+    update_text = pyqtSignal(str)
+    trigger_screenshot = pyqtSignal()
+    ocr_finished = pyqtSignal(object, str)
+    gpt_partial = pyqtSignal(str)
+    gpt_finished = pyqtSignal(str)
 
-    def __init__(self, 
-                 client: OpenAI, 
-                 system_prompt: str, 
-                 user_prompt: str) -> None:
+    def __init__(self) -> None:
         """
-        Initializes the GPTWorker.
-
-        Args:
-            client (OpenAI): An instance of the OpenAI client used to perform the completion.
-            system_prompt (str): The system-level instructions guiding GPT behavior.
-            user_prompt (str): The user's input prompt.
+        Initializes the Communicator with no additional setup.
         """
         super().__init__()
-        self.client = client
-        self.system_prompt = system_prompt
-        self.user_prompt = user_prompt
 
-    def run(self) -> None:
-        """
-        Executes the GPT completion in a separate thread and emits the result.
-        """
-        try:
-            result = run_gpt_completion(self.client,
-                                        self.system_prompt, 
-                                        self.user_prompt)
-        except Exception as e:
-            result = f"Error: {e}"
-        self.finished.emit(result)
+# === Thread Pool Tasks ===
 
-class OCRWorker(QThread):
+class OCRTask(QRunnable):
     """
-    Worker thread for performing OCR and preparing game data without blocking the UI.
+    Task performing OCR and preparing game data on Qt's global thread pool without blocking the UI.
 
-    Emits:
-        finished (PokerState | None, str): The parsed PokerState object and prompt, or error message.
+    The result is emitted through the `ocr_finished` signal of the given Communicator.
     """
-    finished = pyqtSignal(object, str)
 
-    def __init__(self, screenshot: Image, ocr_reader: Reader) -> None:
+    def __init__(self, 
+                 screenshot: Image, 
+                 ocr_reader: Reader, 
+                 communicator: Communicator,
+                 origin: tuple[int, int] = (0, 0),
+                 dealer_hint: Optional[int] = None) -> None:
         """
-        Initializes the OCR worker thread.
+        Initializes the OCR task.
 
         Args:
             screenshot (Image): Screenshot of the game area for OCR.
             ocr_reader (Reader): An instance of EasyOCR reader.
+            communicator (Communicator): The signal bridge used to send the result back to the GUI.
+            origin (tuple[int, int]): Screen coordinates (left, top) of the screenshot's top-left corner.
+            dealer_hint (Optional[int]): Dealer index found in the previous analysis, if any.
         """
         super().__init__()
         self.screenshot = screenshot
         self.ocr_reader = ocr_reader
+        self.communicator = communicator
+        self.origin = origin
+        self.dealer_hint = dealer_hint
 
     def run(self) -> None:
         """
         Executes OCR and prepares the prompt, emitting the result upon completion.
         """
         try:
-            poker_state = PokerState(image=self.screenshot, ocr_reader=self.ocr_reader)
-            player_msgs, table_msg = poker_state.prepare_game_data()
-
-            lines = []
-            for player in player_msgs:
-                lines.extend([item["text"] for item in player["content"]])
-            lines.extend([item["text"] for item in table_msg["content"]])
-            final_prompt = "\n".join(lines)
-
-            self.finished.emit(poker_state, final_prompt)
+            # No autograd bookkeeping for any of the EasyOCR forward passes
+            with torch.inference_mode():
+                poker_state = PokerState(image=self.screenshot, 
+                                         ocr_reader=self.ocr_reader, 
+                                         origin=self.origin,
+                                         dealer_hint=self.dealer_hint)
+                player_msgs, table_msg = poker_state.prepare_game_data()
+
+            texts = chain.from_iterable((item["text"] for item in msg["content"]) 
+                                        for msg in (*player_msgs, table_msg))
+            final_prompt = "\n".join(texts)
+
+            self.communicator.ocr_finished.emit(poker_state, final_prompt)
         except Exception as e:
-            self.finished.emit(None, f"Error during OCR processing: {e}")
-
-# === Communicator ===
-
-class Communicator(QObject):
-    """
-    A communication helper class to emit signals between threads and GUI components.
-
-    Signals:
-        update_text (str): Emitted when text needs to be updated in the GUI.
-        trigger_screenshot (): Emitted to signal that a screenshot should be taken.
-    """
-    update_text = pyqtSignal(str)
-    trigger_screenshot = pyqtSignal()
-
-    def __init__(self) -> None:
-        """
-        Initializes the Communicator with no additional setup.
-        """
-        super().__init__()
+            self.communicator.ocr_finished.emit(None, f"Error during OCR processing: {e}")
 
 # === GUI ===
 
@@ -164,24 +158,51 @@ class PokerAssistantGUI(QWidget):
     The main GUI window for the Poker Assistant application.
     Handles OCR, GPT integration, and user interactions.
     """
-    def __init__(self, client: OpenAI) -> None:
+    def __init__(self, 
+                 backend: LLMBackend, 
+                 loop: asyncio.AbstractEventLoop) -> None:
         """
         Initializes the PokerAssistantGUI with OCR capabilities and GPT integration.
 
         Args:
-            client (OpenAI): An instance of the OpenAI client for GPT completions.
+            backend (LLMBackend): The language model backend for GPT completions (OpenAI API or local model).
+            loop (asyncio.AbstractEventLoop): The background event loop running the GPT requests.
         """
         super().__init__()
-        self.client = client
-        self.ocr_reader = easyocr.Reader(['en'], gpu=True)
+        self.backend = backend
+        self.loop = loop
+        self.ocr_reader = create_ocr_reader(gpu=True)
+        self.table_region = PokerState.table_bounding_box() # (left, top, width, height) of the captured area
         self.is_closing = False
         self.processing = False
+        self.last_dealer_index: Optional[int] = None # reused as a hint by the next analysis
+        self.last_frame: Optional[bytes] = None # pixels of the last screenshot analyzed
+        self.last_prompt: Optional[str] = None # prompt built from that screenshot
+
+        self.thread_pool = QThreadPool.globalInstance()
 
         self.communicator = Communicator()
         self.communicator.update_text.connect(self.show_message)
         self.communicator.trigger_screenshot.connect(self._trigger_analysis_safe)
+        self.communicator.ocr_finished.connect(self.handle_ocr_result)
+        self.communicator.gpt_partial.connect(self.update_text)
+        self.communicator.gpt_finished.connect(self._handle_gpt_result)
 
         self.init_ui()
+        self.excluded_from_capture = self._exclude_from_screen_capture()
+
+    def _exclude_from_screen_capture(self) -> bool:
+        """
+        Asks the OS to leave this window out of screen captures, so that it does not
+        need to be hidden before each screenshot. Only supported on Windows 10 2004+.
+
+        Returns:
+            bool: True if the window is excluded from captures, False if it must be hidden instead.
+        """
+        if sys.platform != "win32":
+            return False
+        hwnd = int(self.winId())
+        return bool(ctypes.windll.user32.SetWindowDisplayAffinity(hwnd, _WDA_EXCLUDEFROMCAPTURE))
 
     def init_ui(self) -> None:
         """
@@ -217,28 +238,49 @@ class PokerAssistantGUI(QWidget):
 
     def _trigger_analysis_safe(self) -> None:
         """
-        Safely triggers analysis by briefly hiding the GUI and scheduling screenshot capture.
-        Used to ensure the window isn't included in the screenshot.
+        Safely triggers analysis, ensuring the window isn't included in the screenshot.
+
+        If the window is excluded from captures by the OS, the screenshot is taken right away.
+        Otherwise, the GUI is briefly hidden and the screenshot capture is scheduled.
         """
+        if self.excluded_from_capture:
+            self.take_screenshot_then_start_processing()
+            return
         self.hide()
-        QTimer.singleShot(200, self.take_screenshot_then_start_processing)
+        QTimer.singleShot(_HIDE_DELAY_MS, self.take_screenshot_then_start_processing)
 
     def take_screenshot_then_start_processing(self) -> None:
         """
-        Captures a screenshot, shows the GUI again, and starts the OCR processing
-        in a background thread using OCRWorker.
+        Captures a screenshot of the table area only, shows the GUI again, and starts 
+        the OCR processing on Qt's global thread pool using OCRTask.
+
+        If the screenshot is identical to the previous one (e.g. while waiting for an opponent),
+        the prompt built from it is reused and the OCR is skipped.
         """
-        screenshot = pyautogui.screenshot()
+        screenshot = pyautogui.screenshot(region=self.table_region)
         self.show()
 
-        self.ocr_worker = OCRWorker(screenshot, self.ocr_reader)
-        self.ocr_worker.finished.connect(self.handle_ocr_result)
-        self.ocr_worker.start()
+        # Comparing the raw pixels (~1 ms for the table area) is cheaper than hashing them
+        frame = screenshot.tobytes()
+        if frame == self.last_frame and self.last_prompt is not None:
+            self.request_completion(self.last_prompt)
+            return
+        self.last_frame = frame
+        self.last_prompt = None
+
+        left, top, _, _ = self.table_region
+        ocr_task = OCRTask(screenshot, 
+                           self.ocr_reader, 
+                           self.communicator, 
+                           origin=(left, top), 
+                           dealer_hint=self.last_dealer_index)
+        self.thread_pool.start(ocr_task)
 
     def handle_ocr_result(self, poker_state: Union[PokerState, None], prompt_or_error: str) -> None:
         """
-        Handles the result from the OCRWorker. If OCR failed, displays the error.
-        Otherwise, starts the GPTWorker to process the generated prompt.
+        Handles the result from the OCRTask. If OCR failed, displays the error.
+        Otherwise, keeps the generated prompt for an identical next screenshot, and requests
+        the GPT completion for it.
 
         Args:
             poker_state (PokerState | None): The parsed poker state object, or None on error.
@@ -249,16 +291,42 @@ class PokerAssistantGUI(QWidget):
             self.processing = False
             return
 
-        self.gpt_worker = GPTWorker(self.client,
-                                    initial_instruction["content"], 
-                                    prompt_or_error)
-        self.gpt_worker.finished.connect(self._handle_gpt_result)
-        self.gpt_worker.start()
+        self.last_dealer_index = poker_state.dealer_index
+        self.last_prompt = prompt_or_error
+        self.request_completion(prompt_or_error)
+
+    def request_completion(self, prompt: str) -> None:
+        """
+        Submits the GPT request for the given prompt to the background event loop.
+
+        Args:
+            prompt (str): The prompt describing the game state.
+        """
+        completion = run_gpt_completion(self.backend,
+                                        initial_instruction["content"], 
+                                        prompt,
+                                        on_delta=self.communicator.gpt_partial.emit)
+        future = asyncio.run_coroutine_threadsafe(completion, self.loop)
+        future.add_done_callback(self._emit_gpt_result)
+
+    def _emit_gpt_result(self, future: Future) -> None:
+        """
+        Emits the result of a completed GPT request, or an error message if it failed.
+        Called from the event loop thread, the signal is delivered to the GUI thread.
+
+        Args:
+            future (Future): The completed future of the GPT request.
+        """
+        try:
+            result = future.result()
+        except Exception as e:
+            result = f"Error: {e}"
+        self.communicator.gpt_finished.emit(result)
 
 
     def _handle_gpt_result(self, response: str) -> None:
         """
-        Handles the result from GPTWorker by updating the UI and resetting the processing state.
+        Handles the result of the GPT request by updating the UI and resetting the processing state.
 
         Args:
             response (str): The assistant's reply generated by GPT.
@@ -343,13 +411,34 @@ def start_key_listener(gui_ref: PokerAssistantGUI) -> None:
     listener = keyboard.Listener(on_press=on_press)
     listener.start()
 
+# === Background Event Loop ===
+
+def start_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Starts an asyncio event loop running forever in a daemon thread.
+
+    GPT requests are submitted to it from the GUI thread, so that they all share 
+    the asynchronous client's connections without blocking any worker thread.
+
+    Returns:
+        asyncio.AbstractEventLoop: The running event loop.
+    """
+    loop = asyncio.new_event_loop()
+    loop_thread = Thread(target=loop.run_forever, daemon=True)
+    loop_thread.start()
+    return loop
+
 # === Main Function ===
 
 def main() -> None:
     """
     Entry point for the Poker Assistant application.
 
-    - Initializes the OpenAI client.
+    - Lets PyTorch use faster, lower precision float32 matrix multiplications (TF32) for the OCR.
+    - Starts the background event loop running the GPT requests.
+    - Loads the local llama.cpp model if `_LLAMA_MODEL_PATH` is set. Otherwise, initializes the
+      asynchronous OpenAI client, once for the whole process, over a keep-alive HTTP/2 connection
+      so TLS handshakes are not paid again on every analysis.
     - Sets up the Qt application and main GUI window.
     - Starts a background thread to listen for keyboard shortcuts.
     - Begins the Qt event loop.
@@ -357,9 +446,22 @@ def main() -> None:
     Returns:
         None
     """
-    client = openai.OpenAI(api_key=_OPENAI_KEY)
+    torch.set_float32_matmul_precision('medium')
+    loop = start_event_loop()
+    backend: LLMBackend
+    if _LLAMA_MODEL_PATH is not None:
+        backend = LlamaCppBackend(_LLAMA_MODEL_PATH)
+    else:
+        http_client = openai.DefaultAsyncHttpxClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=5, keepalive_expiry=_KEEPALIVE_EXPIRY)
+        )
+        client = openai.AsyncOpenAI(api_key=_OPENAI_KEY,
+                                    timeout=_OPENAI_TIMEOUT,
+                                    http_client=http_client)
+        backend = OpenAIBackend(client)
     app = QApplication(sys.argv)
-    gui = PokerAssistantGUI(client)
+    gui = PokerAssistantGUI(backend, loop)
 
     key_thread = Thread(target=start_key_listener, args=(gui,), daemon=True)
     key_thread.start()
@@ -0,0 +1,79 @@
+import torch
+from easyocr import Reader
+from functools import lru_cache
+from typing import Any
+
+class HalfPrecisionModule(torch.nn.Module):
+    """
+    Wraps an EasyOCR network so that it runs in half precision (FP16) on the GPU.
+
+    Floating point tensor inputs are cast to FP16 before the forward pass, and floating
+    point tensor outputs are cast back to FP32, so that EasyOCR's NumPy/OpenCV
+    post-processing (which does not support float16) is left unchanged.
+    """
+    def __init__(self, module: torch.nn.Module) -> None:
+        """
+        Initializes the wrapper and converts the wrapped module's weights to FP16.
+
+        Args:
+            module (torch.nn.Module): The network to run in half precision.
+        """
+        super().__init__()
+        self.module = module.half()
+
+    def forward(self, *args: Any) -> Any:
+        """
+        Runs the wrapped module with FP16 inputs and returns FP32 outputs.
+
+        Args:
+            *args (Any): Positional inputs of the wrapped module.
+
+        Returns:
+            Any: The wrapped module's output (tensor or tuple of tensors), cast back to FP32.
+        """
+        half_args = [_cast_floating(arg, torch.float16) for arg in args]
+        output = self.module(*half_args)
+        if isinstance(output, tuple):
+            return tuple(_cast_floating(item, torch.float32) for item in output)
+        return _cast_floating(output, torch.float32)
+
+def _cast_floating(value: Any, dtype: torch.dtype) -> Any:
+    """
+    Casts a value to the given dtype if it is a floating point tensor, and returns it unchanged otherwise.
+
+    Args:
+        value (Any): The value to cast.
+        dtype (torch.dtype): The target floating point dtype.
+
+    Returns:
+        Any: The cast tensor, or the original value.
+    """
+    if isinstance(value, torch.Tensor) and value.is_floating_point():
+        return value.to(dtype)
+    return value
+
+@lru_cache(maxsize=None)
+def create_ocr_reader(gpu: bool = True) -> Reader:
+    """
+    Creates the EasyOCR reader used to read stacks, bets and pot values.
+
+    On a CUDA device, cuDNN autotuning is enabled and both the detector and the recognizer
+    run in half precision, halving the bytes moved on the GPU and using its FP16 units.
+    On CPU, EasyOCR's default dynamic quantization is kept.
+
+    Loading the models takes seconds, so the reader is created once per `gpu` value and
+    shared by every later call.
+
+    Args:
+        gpu (bool): Whether to use the GPU if available. Defaults to True.
+
+    Returns:
+        Reader: The configured EasyOCR reader.
+    """
+    reader = Reader(['en'], gpu=gpu, cudnn_benchmark=True)
+
+    if str(reader.device).startswith('cuda'):
+        reader.detector = HalfPrecisionModule(reader.detector)
+        reader.recognizer = HalfPrecisionModule(reader.recognizer)
+
+    return reader
@@ -3,13 +3,15 @@ from io import BytesIO
 import numpy
 import cv2
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import ClassVar, Literal, Optional
+from numpy.typing import NDArray
 from easyocr import Reader
-from constants import _CARD_RANK_MASKS, _CARD_SYMBOL_MASKS, _RANK_INDICES_MAPPING, _SYMBOL_INDICES_MAPPING
-from image_processing import find_best_match, to_ink_mask, apply_diagonal_mask_top_left
-import time 
+from constants import _CARD_RANK_MASKS_PACKED, _CARD_SYMBOL_MASKS_PACKED, _RANK_INDICES_MAPPING, _SYMBOL_INDICES_MAPPING
+from image_processing import count_mask_pixels, crop_to_text, find_best_ink_match, has_enough_color, pack_words
+import time
 
-@dataclass
+@dataclass(slots=True)
 class PlayerInfo:
     """
     Represents the game-related state of a single poker player.
@@ -32,13 +34,32 @@ class PlayerInfo:
     position: Optional[str] = None
     has_all_in: bool = field(default=False)
 
+def _shifted_regions(base: dict[str, int], shift: int, count: int) -> list[dict[str, int]]:
+    """
+    Builds `count` copies of a region, each one shifted horizontally by `shift` pixels from the previous one.
+
+    Args:
+        base (dict[str, int]): The first region, with keys 'left', 'top', 'width', and 'height'.
+        shift (int): Horizontal distance, in pixels, between two consecutive regions.
+        count (int): Number of regions to build.
+
+    Returns:
+        list[dict[str, int]]: The shifted regions, from left to right.
+    """
+    return [{**base, "left": base["left"] + i * shift} for i in range(count)]
+
 class PokerState:
     """
     Represents the state of a poker game based on image-based OCR and template matching.
 
     Attributes:
-        image (Image): The screenshot or input image from which the game state is parsed.
+        image (Image | NDArray[numpy.uint8]): The screenshot or input image from which the game state is parsed.
+        rgb (NDArray[numpy.uint8]): The image as an (H, W, 3) RGB array, converted once and
+                                    sliced by every region crop.
         ocr_reader (Reader): EasyOCR reader instance used to extract textual data.
+        origin (tuple[int, int]): Screen coordinates (left, top) of the image's top-left corner.
+        dealer_hint (Optional[int]): Dealer index found in a previous frame, checked first.
+        dealer_index (Optional[int]): Dealer index found in this frame, once the game data is prepared.
         preflop (bool): Whether the current game phase is preflop (no community cards yet).
         players (list[PlayerInfo]): List of player information objects, one per seat.
     """
@@ -96,121 +117,169 @@ class PokerState:
     player1_symbol_base: ClassVar[dict] = {"left": 830, "top": 741, "width": 35, "height": 31}
     player1_symbol_shift: ClassVar[int] = 43  # Mask 1 to Card 2 symbol left edge
 
-    card_rank_masks: ClassVar[numpy.ndarray] = _CARD_RANK_MASKS
-    card_symbol_masks: ClassVar[numpy.ndarray] = _CARD_SYMBOL_MASKS
-    rank_indices_mapping: dict[int, str] = _RANK_INDICES_MAPPING
-    symbol_indices_mapping: dict[int, str] = _SYMBOL_INDICES_MAPPING
+    # === Card regions, computed once from the bases and shifts above ===
+    table_card_regions: ClassVar[list[dict]] = _shifted_regions(table_card_base, table_shift, max_nb_players)
+    table_rank_regions: ClassVar[list[dict]] = _shifted_regions(table_rank_base, table_rank_shift, max_nb_players)
+    table_symbol_regions: ClassVar[list[dict]] = _shifted_regions(table_symbol_base, table_symbol_shift, max_nb_players)
+    player1_rank_regions: ClassVar[list[dict]] = _shifted_regions(player1_rank_base, player1_rank_shift, 2)
+    player1_symbol_regions: ClassVar[list[dict]] = _shifted_regions(player1_symbol_base, player1_symbol_shift, 2)
+
+    card_rank_masks: ClassVar[numpy.ndarray] = pack_words(_CARD_RANK_MASKS_PACKED)
+    card_symbol_masks: ClassVar[numpy.ndarray] = pack_words(_CARD_SYMBOL_MASKS_PACKED)
+    card_rank_counts: ClassVar[numpy.ndarray] = count_mask_pixels(card_rank_masks)
+    card_symbol_counts: ClassVar[numpy.ndarray] = count_mask_pixels(card_symbol_masks)
+    rank_indices_mapping: ClassVar[tuple[str, ...]] = _RANK_INDICES_MAPPING
+    symbol_indices_mapping: ClassVar[tuple[str, ...]] = _SYMBOL_INDICES_MAPPING
 
     rank_threshold: ClassVar[int] = 240 # FIXME: not good threshold.
+    rank_diagonal_strength: ClassVar[float] = 0.3 # top-left triangle of the rank crop, ignored when matching
     symbol_threshold: ClassVar[int] = 200
 
-    def __init__(self, image: Image, ocr_reader: Reader) -> None:
+    # Color predicates on the large stack, bet and card back regions only sample one pixel out of
+    # `predicate_stride` along each axis: the colored areas are far above their thresholds.
+    predicate_stride: ClassVar[int] = 2
+
+    # === Text colors, as inclusive (R, G, B) lower and upper bounds ===
+    stack_text_color: ClassVar[tuple[tuple[int, int, int], tuple[int, int, int]]] = ((200, 150, 0), (255, 197, 90))
+    all_in_text_color: ClassVar[tuple[tuple[int, int, int], tuple[int, int, int]]] = ((170, 0, 0), (255, 60, 60))
+    bet_text_color: ClassVar[tuple[tuple[int, int, int], tuple[int, int, int]]] = ((200, 170, 0), (255, 240, 100))
+
+    # Stack and bet crops are narrowed to their line of text before OCR. The gap is wider than the
+    # space between a value and 'BB' (up to ~18 px), and narrower than the one separating it from
+    # the turn timer drawn at the left of the stack regions (30 px or more).
+    text_max_gap: ClassVar[int] = 24
+    text_margin: ClassVar[int] = 4
+    # Characters of the stack and bet values (e.g. '97,5 BB'), the only ones the recognizer may output for them
+    value_allowlist: ClassVar[str] = "0123456789,. B"
+
+    # === Player messages ===
+    move_codes: ClassVar[dict[str, str]] = {"all-in": "B-ALLIN", "bet": "B", "check": "C", "fold": "F", "NP": "NP"}
+    absent_player_template: ClassVar[str] = "Player %d - Status: absent"
+    hero_player_template: ClassVar[str] = "Player %d - Status: present - Position: %s"
+    other_player_template: ClassVar[str] = "Player %d - Status: present - Move: %s - Position: %s"
+
+    # Prints the duration of each `prepare_game_data` call when enabled
+    debug_timing: ClassVar[bool] = False
+
+    def __init__(self, 
+                 image: Image | NDArray[numpy.uint8], 
+                 ocr_reader: Reader, 
+                 origin: tuple[int, int] = (0, 0),
+                 dealer_hint: Optional[int] = None) -> None:
         """
         Initializes the PokerState with image and OCR reader, sets preflop status, and prepares players.
 
         Args:
-            image (Image): Screenshot of the poker table.
+            image (Image | NDArray[numpy.uint8]): Screenshot of the poker table, as a PIL image or as an
+                                                  (H, W, 3) RGB array, which is used without any copy.
             ocr_reader (Reader): EasyOCR reader instance.
+            origin (tuple[int, int]): Screen coordinates (left, top) of the screenshot's top-left corner,
+                                      e.g. the first two values of `table_bounding_box()` when only the
+                                      table area was captured. Defaults to (0, 0) for full screenshots.
+            dealer_hint (Optional[int]): Dealer index found in a previous frame, if any. The button only
+                                         moves once per hand, so its region is checked before the others.
         """
         self.image = image
+        if isinstance(image, numpy.ndarray):
+            self.rgb: NDArray[numpy.uint8] = image
+        else:
+            rgb_image = image if image.mode == "RGB" else image.convert("RGB") # screenshots already are RGB
+            self.rgb = numpy.asarray(rgb_image)
         self.ocr_reader = ocr_reader
+        self.origin = origin
+        self.dealer_hint = dealer_hint
+        self.dealer_index: Optional[int] = None
         self.preflop: bool = True
         self.players: list[PlayerInfo] = [
             PlayerInfo(i, "absent") for i in range(self.max_nb_players)
         ]
 
-    def crop_region(self, region: dict[str, int]) -> Image:
+    @classmethod
+    def table_bounding_box(cls) -> tuple[int, int, int, int]:
+        """
+        Computes the smallest screen rectangle containing every region analyzed on the table.
+
+        Capturing only this rectangle (instead of the full screen) is enough to
+        determine the whole game state.
+
+        Returns:
+            tuple[int, int, int, int]: The (left, top, width, height) of the rectangle, in screen coordinates.
+        """
+        regions = [*cls.stack_regions, *cls.bet_regions, *cls.card_back_regions, *cls.button_regions, cls.pot_region,
+                   *cls.table_card_regions, *cls.player1_rank_regions, *cls.player1_symbol_regions]
+
+        left = min(region["left"] for region in regions)
+        top = min(region["top"] for region in regions)
+        right = max(region["left"] + region["width"] for region in regions)
+        bottom = max(region["top"] + region["height"] for region in regions)
+
+        return left, top, right - left, bottom - top
+
+    def crop_region(self, region: dict[str, int]) -> NDArray[numpy.uint8]:
         """
         Crops a rectangular region from the current image using the provided bounding box.
 
+        The crop is a view on the RGB array of the image: no pixel is copied.
+
         Args:
             region (dict[str, int]): A dictionary with keys 'left', 'top', 'width', and 'height'
-                                    defining the rectangular region to crop.
+                                    defining the rectangular region to crop, in screen coordinates.
 
         Returns:
-            Image: A PIL Image object representing the cropped region.
+            NDArray[numpy.uint8]: An (height, width, 3) RGB view of the cropped region.
         """
-        box: tuple[int, int, int, int] = (
-            region["left"],
-            region["top"],
-            region["left"] + region["width"],
-            region["top"] + region["height"]
-        )
+        left = region["left"] - self.origin[0]
+        top = region["top"] - self.origin[1]
 
-        return self.image.crop(box)
+        return self.rgb[top:top + region["height"], left:left + region["width"]]
 
-    def has_stack(self, crop: Image, threshold: int = 30) -> numpy.bool_:
+    def has_stack(self, crop: NDArray[numpy.uint8], threshold: int = 30) -> bool:
         """
         Detects yellow/orange text (e.g., '100 BB') in a cropped image.
 
         Args:
-            crop (Image): Cropped image containing the stack value text.
+            crop (NDArray[numpy.uint8]): Cropped image containing the stack value text.
             threshold (int): Minimum number of yellow/orange pixels to confirm presence.
 
         Returns:
             bool: True if yellow/orange stack text is detected, False otherwise.
         """
-        color_crop = crop.convert("RGB")
-        arr = numpy.array(color_crop)
-
-        yellow_mask = (
-            (arr[:, :, 0] >= 200) & (arr[:, :, 0] <= 255) &  # Red
-            (arr[:, :, 1] >= 150) & (arr[:, :, 1] <= 197) &  # Green
-            (arr[:, :, 2] >= 0)   & (arr[:, :, 2] <= 90)     # Blue
-        )
-
-        yellow_pixel_count = numpy.sum(yellow_mask)
-        has_enough_yellow = yellow_pixel_count > threshold
+        has_enough_yellow = has_enough_color(crop, *self.stack_text_color, threshold, self.predicate_stride)
 
         return has_enough_yellow
 
-    def has_yellow_bet(self, crop: Image, threshold: int = 30) -> numpy.bool_:
+    def has_yellow_bet(self, crop: NDArray[numpy.uint8], threshold: int = 30) -> bool:
         """
         Detects the presence of bet amount based on the (yellow) pixel color analysis.
 
         Args:
-            crop (Image): Cropped image from the expected bet zone.
+            crop (NDArray[numpy.uint8]): Cropped image from the expected bet zone.
             threshold (int): Minimum number of yellow-like pixels required to confirm presence.
 
         Returns:
             bool: True if a yellow bet label is detected, False otherwise.
         """
-        arr = numpy.array(crop.convert("RGB"))
-        yellow_mask = (
-            (arr[:, :, 0] >= 200) & (arr[:, :, 0] <= 255) &  # Red
-            (arr[:, :, 1] >= 170) & (arr[:, :, 1] <= 240) &  # Green
-            (arr[:, :, 2] >= 0)   & (arr[:, :, 2] <= 100)    # Blue
-        )
-        yellow_pixel_count = numpy.sum(yellow_mask)
-        has_enough_yellow = yellow_pixel_count > threshold
+        has_enough_yellow = has_enough_color(crop, *self.bet_text_color, threshold, self.predicate_stride)
 
         return has_enough_yellow
 
-    def has_unfolded(self, crop: Image, threshold: int = 100) -> numpy.bool_:
+    def has_unfolded(self, crop: NDArray[numpy.uint8], threshold: int = 100) -> bool:
         """
         Determines whether a player has not folded based on red card back presence.
 
         Args:
-            crop (PIL.Image): Cropped image of the card area.
+            crop (NDArray[numpy.uint8]): Cropped image of the card area.
             threshold (int): Minimum number of red pixels to confirm presence.
 
         Returns:
             bool: True if the red card backs are present (not folded), else False.
         """
-        color_crop = crop.convert("RGB")
-        arr = numpy.array(color_crop)
-        # Mask for bright/dark red area of card backs (excluding white border)
-        red_mask = (
-            (arr[:, :, 0] >= 200) & (arr[:, :, 0] <= 255) &
-            (arr[:, :, 1] >= 25)  & (arr[:, :, 1] <= 60) &
-            (arr[:, :, 2] >= 25)  & (arr[:, :, 2] <= 60)
-        )
-        red_pixel_count = numpy.sum(red_mask)
-        has_enough_red = red_pixel_count > threshold
+        # Bright/dark red area of card backs (excluding white border)
+        has_enough_red = has_enough_color(crop, (200, 25, 25), (255, 60, 60), threshold, self.predicate_stride)
 
         return has_enough_red
 
-    def has_card(self, crop: Image, threshold: int = 200) -> bool:
+    def has_card(self, crop: NDArray[numpy.uint8], threshold: int = 200) -> bool:
         """
         Determines whether a card is present in a cropped region by detecting white contours.
 
@@ -218,119 +287,137 @@ class PokerState:
         and evaluating whether any significant contour areas are detected.
 
         Args:
-            crop (Image): Cropped image of the card zone.
+            crop (NDArray[numpy.uint8]): Cropped image of the card zone.
             threshold (int): Minimum contour area required to consider a card present.
 
         Returns:
             bool: True if at least one large white contour is detected, False otherwise.
         """
-        arr = numpy.array(crop.convert("RGB"))
-        gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
+        gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
         _, binary = cv2.threshold(gray, 240, 255, cv2.THRESH_BINARY)
         contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        significant_contours = [cnt for cnt in contours if cv2.contourArea(cnt) > threshold]
 
-        return len(significant_contours) > 0
+        return any(cv2.contourArea(cnt) > threshold for cnt in contours)
 
-    def has_dealer_button(self, crop: Image, threshold=50) -> bool:
+    def has_dealer_button(self, crop: NDArray[numpy.uint8], threshold=50) -> bool:
         """
         Detect if the dealer button (orange/yellow circular D) is present.
         
         Parameters:
-            crop (PIL.Image): Cropped image of the suspected dealer button zone.
+            crop (NDArray[numpy.uint8]): Cropped image of the suspected dealer button zone.
             threshold (int): Minimum number of yellow-orange pixels to confirm presence.
         
         Returns:
             bool: True if dealer button is detected, False otherwise.
         """
-        arr = numpy.array(crop.convert("RGB"))
-        # Define mask for bright yellow-orange tones
-        mask = (
-            (arr[:, :, 0] >= 200) &  # High red
-            (arr[:, :, 1] >= 130) &  # Mid to high green
-            (arr[:, :, 2] <= 100)    # Low blue
-        )
-        count = numpy.sum(mask)
-        has_dealer = count > threshold
+        # Bright yellow-orange tones: high red, mid to high green, low blue
+        has_dealer = has_enough_color(crop, (200, 130, 0), (255, 255, 100), threshold)
 
         return has_dealer
     
-    def has_all_in(self, crop: Image, threshold:int = 40) -> numpy.bool_:
+    def has_all_in(self, crop: NDArray[numpy.uint8], threshold:int = 40) -> bool:
         """
         Detects the presence of ALL-IN red text in a cropped image.
 
         Args:
-            crop (PIL.Image): cropped stack region.
+            crop (NDArray[numpy.uint8]): cropped stack region.
             threshold (int): minimum number of red pixels to confirm ALL-IN.
 
         Returns:
             bool: True if ALL-IN red text detected, False otherwise.
         """
-        arr = numpy.array(crop.convert("RGB"))
-        red_mask = (
-            (arr[:, :, 0] >= 170) & (arr[:, :, 0] <= 255) &
-            (arr[:, :, 1] >= 0)   & (arr[:, :, 1] <= 60) &
-            (arr[:, :, 2] >= 0)   & (arr[:, :, 2] <= 60)
-        )
-        red_pixel_count = numpy.sum(red_mask)
-        has_enough_red = red_pixel_count > threshold
+        has_enough_red = has_enough_color(crop, *self.all_in_text_color, threshold, self.predicate_stride)
 
         return has_enough_red
 
-    def get_card_rank(self, rank_crop: Image) -> str:
+    @classmethod
+    def get_card_rank(cls, rank_crop: NDArray[numpy.uint8]) -> str:
         """
         Matches a cropped card rank region against known rank templates.
 
-        Applies preprocessing (diagonal masking, ink masking) and selects the
-        best matching rank index using template matching.
+        Applies preprocessing (diagonal masking, ink masking, bit packing) and selects
+        the best matching rank index using template matching.
 
         Args:
-            rank_crop (Image): Cropped image of the card rank area.
+            rank_crop (NDArray[numpy.uint8]): Cropped image of the card rank area.
 
         Returns:
             str: The matched rank character (e.g., 'A', 'K', '9').
         """
-        arr = numpy.array(rank_crop)
-        arr_with_diag_mask = apply_diagonal_mask_top_left(arr)
-        arr_ink_mask = to_ink_mask(arr_with_diag_mask, self.rank_threshold)
-        best_rank_match_index, _ = find_best_match(arr_ink_mask, self.card_rank_masks)
-        card_rank = self.rank_indices_mapping[best_rank_match_index]
+        best_rank_match_index, _ = find_best_ink_match(rank_crop,
+                                                       cls.rank_threshold,
+                                                       cls.card_rank_masks, 
+                                                       cls.card_rank_counts,
+                                                       diagonal_strength=cls.rank_diagonal_strength)
+        card_rank = cls.rank_indices_mapping[best_rank_match_index]
 
         return card_rank
 
-    def get_card_symbol(self, symbol_crop: Image) -> str:
+    @classmethod
+    def get_card_symbol(cls, symbol_crop: NDArray[numpy.uint8]) -> str:
         """
         Matches a cropped card symbol region against known suit templates.
 
-        Applies ink masking and selects the best matching suit index using template matching.
+        Applies ink masking and bit packing, and selects the best matching suit index
+        using template matching.
 
         Args:
-            symbol_crop (Image): Cropped image of the suit symbol area.
+            symbol_crop (NDArray[numpy.uint8]): Cropped image of the suit symbol area.
 
         Returns:
             str: The matched suit character (e.g., '♠', '♦', 'h').
         """
-        arr = numpy.array(symbol_crop)
-        arr_ink_mask = to_ink_mask(arr, self.symbol_threshold)
-        best_symbol_match_index, _ = find_best_match(arr_ink_mask, self.card_symbol_masks)
-        card_symbol = self.symbol_indices_mapping[best_symbol_match_index]
+        best_symbol_match_index, _ = find_best_ink_match(symbol_crop,
+                                                         cls.symbol_threshold,
+                                                         cls.card_symbol_masks, 
+                                                         cls.card_symbol_counts)
+        card_symbol = cls.symbol_indices_mapping[best_symbol_match_index]
 
         return card_symbol
 
 
-    def get_card(self, rank_crop: Image, symbol_crop: Image) -> str:
+    def get_card(self, rank_crop: NDArray[numpy.uint8], symbol_crop: NDArray[numpy.uint8]) -> str:
         """
         Constructs a readable card string from cropped rank and suit regions.
 
+        Results are memoized on the crops' pixels: the table and hand cards rarely change
+        between two analyses, so most calls skip the template matching entirely.
+
         Args:
-            rank_crop (Image): Cropped image of the card rank.
-            symbol_crop (Image): Cropped image of the card suit.
+            rank_crop (NDArray[numpy.uint8]): Cropped image of the card rank.
+            symbol_crop (NDArray[numpy.uint8]): Cropped image of the card suit.
 
         Returns:
             str: Combined card notation, e.g., 'A♥', '10♠'.
         """
-        rank = self.get_card_rank(rank_crop)
-        suit = self.get_card_symbol(symbol_crop)
+        return self._get_cached_card(rank_crop.tobytes(), rank_crop.shape,
+                                     symbol_crop.tobytes(), symbol_crop.shape)
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def _get_cached_card(
+        cls,
+        rank_bytes: bytes,
+        rank_shape: tuple[int, ...],
+        symbol_bytes: bytes,
+        symbol_shape: tuple[int, ...]
+    ) -> str:
+        """
+        Recognizes a card from the raw pixels of its rank and suit crops. Cached across instances.
+
+        Args:
+            rank_bytes (bytes): Pixels of the rank crop.
+            rank_shape (tuple[int, ...]): Shape of the rank crop.
+            symbol_bytes (bytes): Pixels of the suit crop.
+            symbol_shape (tuple[int, ...]): Shape of the suit crop.
+
+        Returns:
+            str: Combined card notation, e.g., 'A♥', '10♠'.
+        """
+        rank_crop = numpy.frombuffer(rank_bytes, dtype=numpy.uint8).reshape(rank_shape)
+        symbol_crop = numpy.frombuffer(symbol_bytes, dtype=numpy.uint8).reshape(symbol_shape)
+        rank = cls.get_card_rank(rank_crop)
+        suit = cls.get_card_symbol(symbol_crop)
 
         return f"{rank}{suit}"
     
@@ -338,70 +425,67 @@ class PokerState:
         """
         Detects and returns the player index (0-4) who has the dealer button.
 
+        The region of `dealer_hint` is checked first, so that a single region is scanned
+        as long as the button has not moved.
+
         Returns:
             int: Index of the player with the dealer button.
 
         Raises:
             RuntimeError: If no dealer button is found in any player region.
         """
+        hint = self.dealer_hint
+        if hint is not None and self.has_dealer_button(self.crop_region(self.button_regions[hint])):
+            return hint
+
         for player_index, region in enumerate(self.button_regions):
+            if player_index == hint:
+                continue
             crop = self.crop_region(region)
             if self.has_dealer_button(crop):
                 return player_index
 
         raise RuntimeError("Dealer button not found in any region.")
 
-    # TODO: wrap in subfunctions
     def extract_table_cards(self) -> list[str]:
         """
         Detects and returns a list of up to 5 community cards.
 
         Cards are detected locally with pattern matching based on suit and rank.
+        The first card decides whether the flop is dealt (all three flop cards are then read),
+        and the turn and river are only read if they are present.
 
         Returns:
             list[str]: A list of community cards in the format ['A♥', '7♦', ...].
                        Returns an empty list if no flop is detected (i.e., preflop).
         """
-        cards = []
+        if not self.has_card(self.crop_region(self.table_card_regions[0])):
+            return []  # No cards on table: preflop
 
-        for i in range(self.max_nb_players):
-            # Compute main card crop (for presence check)
-            card_region = {
-                "left": self.table_card_base["left"] + i * self.table_shift,
-                "top": self.table_card_base["top"],
-                "width": self.table_card_base["width"],
-                "height": self.table_card_base["height"]
-            }
-            card_crop = self.crop_region(card_region)
-
-            if i == 0 and not self.has_card(card_crop):
-                return []  # No cards on table: preflop
-            
-            elif i < 3 or self.has_card(card_crop):
-                # === Crop rank region ===
-                rank_region = {
-                    "left": self.table_rank_base["left"] + i * self.table_rank_shift,
-                    "top": self.table_rank_base["top"],
-                    "width": self.table_rank_base["width"],
-                    "height": self.table_rank_base["height"]
-                }
-                rank_crop = self.crop_region(rank_region)
-
-                # === Crop suit region ===
-                symbol_region = {
-                    "left": self.table_symbol_base["left"] + i * self.table_symbol_shift,
-                    "top": self.table_symbol_base["top"],
-                    "width": self.table_symbol_base["width"],
-                    "height": self.table_symbol_base["height"]
-                }
-                symbol_crop = self.crop_region(symbol_region)
-
-                # === Get card info ===
-                card = self.get_card(rank_crop, symbol_crop)
-                cards.append(card)
+        cards = [self.get_table_card(i) for i in range(3)]
+
+        for i in (3, 4):
+            if not self.has_card(self.crop_region(self.table_card_regions[i])):
+                break  # the river is never dealt before the turn
+            cards.append(self.get_table_card(i))
 
         return cards
 
+    def get_table_card(self, card_index: int) -> str:
+        """
+        Reads the rank and suit of a community card.
+
+        Args:
+            card_index (int): Position of the card on the table, from 0 (first flop card) to 4 (river).
+
+        Returns:
+            str: Combined card notation, e.g., 'A♥', '10♠'.
+        """
+        rank_crop = self.crop_region(self.table_rank_regions[card_index])
+        symbol_crop = self.crop_region(self.table_symbol_regions[card_index])
+
+        return self.get_card(rank_crop, symbol_crop)
+
     def extract_player1_cards(self) -> list[str]:
         """
         Detects and returns Player 1's hand cards (rank + suit).
@@ -412,23 +496,9 @@ class PokerState:
             list[str]: A list of two card strings (e.g., ['A♥', '9♣']).
         """
         cards = []
-        for i in range(2):
-            # === Crop rank ===
-            rank_region = {
-                "left": self.player1_rank_base["left"] + i * self.player1_rank_shift,
-                "top": self.player1_rank_base["top"],
-                "width": self.player1_rank_base["width"],
-                "height": self.player1_rank_base["height"]
-            }
+        for rank_region, symbol_region in zip(self.player1_rank_regions, self.player1_symbol_regions):
+            # === Crop rank and symbol ===
             rank_crop = self.crop_region(rank_region)
-
-            # === Crop symbol ===
-            symbol_region = {
-                "left": self.player1_symbol_base["left"] + i * self.player1_symbol_shift,
-                "top": self.player1_symbol_base["top"],
-                "width": self.player1_symbol_base["width"],
-                "height": self.player1_symbol_base["height"]
-            }
             symbol_crop = self.crop_region(symbol_region)
 
             # === Get symbolic card ===
@@ -437,34 +507,112 @@ class PokerState:
 
         return cards
 
-    # TODO: wrap in sub-functions
-    def set_player_stacks(self) -> None:
+    def recognize_texts(
+        self,
+        *crop_groups: list[Optional[NDArray[numpy.uint8]]]
+    ) -> tuple[list[Optional[str]], ...]:
+        """
+        Reads the single line of text of several groups of crops, without running the text detector.
+
+        The crops must already be narrowed to their line of text (see `narrow_to_text`), so that
+        EasyOCR's detector (the slow half of its pipeline) is not needed to locate it. They are
+        converted to grayscale and stacked on one canvas, and each of them is given to the
+        recognizer as a horizontal box, in a single batched call. The recognizer sorts the boxes
+        from top to bottom, which keeps them in the order of the crops. Only the characters of
+        `value_allowlist` can be recognized.
+
+        Args:
+            *crop_groups (list[NDArray[numpy.uint8] | None]): Lists of crops to read, where None
+                                                              marks a region with nothing to read.
+
+        Returns:
+            tuple[list[str | None], ...]: For each group, the text read in each crop
+                                          (None where the crop was None), in the same order.
         """
-        Detects and sets each player's stack value based on predefined image regions.
+        crops = [crop for group in crop_groups for crop in group if crop is not None]
+        if not crops:
+            return tuple([None] * len(group) for group in crop_groups)
+
+        height = sum(crop.shape[0] for crop in crops)
+        width = max(crop.shape[1] for crop in crops)
+        canvas = numpy.zeros((height, width), dtype=numpy.uint8)
+        boxes = []
+        top = 0
+        for crop in crops:
+            crop_height, crop_width = crop.shape[:2]
+            canvas[top:top + crop_height, :crop_width] = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+            boxes.append([0, crop_width, top, top + crop_height])
+            top += crop_height
+
+        texts = iter(self.ocr_reader.recognize(canvas, horizontal_list=boxes, free_list=[], 
+                                               batch_size=len(boxes), allowlist=self.value_allowlist,
+                                               detail=0, reformat=False))
+
+        return tuple([next(texts) if crop is not None else None for crop in group]
+                     for group in crop_groups)
+
+    def narrow_to_text(
+        self,
+        crop: NDArray[numpy.uint8],
+        text_color: tuple[tuple[int, int, int], tuple[int, int, int]]
+    ) -> NDArray[numpy.uint8]:
+        """
+        Narrows a stack or bet crop to the columns of its line of text.
 
-        Uses OCR to read stack text for each player. If the player is all-in, sets the
-        `has_all_in` flag accordingly. If no stack is detected, sets the value to an empty string.
+        Args:
+            crop (NDArray[numpy.uint8]): Cropped stack or bet region.
+            text_color (tuple[tuple[int, int, int], tuple[int, int, int]]): Inclusive (R, G, B) bounds of the text color.
 
         Returns:
-            None
+            NDArray[numpy.uint8]: A view on the text columns of the crop.
         """
-        for player_index, region in enumerate(self.stack_regions):
-            player = self.players[player_index]
+        return crop_to_text(crop, *text_color, self.text_max_gap, self.text_margin)
+
+    def get_stack_crops(self) -> tuple[list[Optional[NDArray[numpy.uint8]]], list[bool]]:
+        """
+        Detects which stack regions contain a stack value and returns the matching crops.
+
+        A stack is detected from its yellow/orange text, or from the red ALL-IN label,
+        which holds no value to read and is only reported as a flag. The crops are
+        narrowed to the text, ready for `recognize_texts`.
+
+        Returns:
+            tuple[list[NDArray[numpy.uint8] | None], list[bool]]: For each player, the stack crop if a stack
+                                                                  value is detected, None otherwise (including
+                                                                  all-in players), and whether the ALL-IN label
+                                                                  is detected.
+        """
+        stack_crops: list[Optional[NDArray[numpy.uint8]]] = []
+        all_in_flags = []
+
+        for region in self.stack_regions:
             crop = self.crop_region(region)
-            crop_arr = numpy.array(crop)
 
             if self.has_stack(crop):
-                ocr_result = self.ocr_reader.readtext(crop_arr, detail=0)
-                player.stack = ocr_result[0]
-            elif self.has_all_in(crop):
-                ocr_result = self.ocr_reader.readtext(crop_arr, detail=0)
-                player.stack = ocr_result[0]
-                player.has_all_in = True
+                stack_crops.append(self.narrow_to_text(crop, self.stack_text_color))
+                all_in_flags.append(False)
             else:
-                player.stack = ''
+                stack_crops.append(None)
+                all_in_flags.append(self.has_all_in(crop))
 
+        return stack_crops, all_in_flags
 
-    def get_bet_crops(self, present_player_indices: list[int]) -> list[Image]:
+    def set_player_stacks(self, stack_texts: list[Optional[str]]) -> None:
+        """
+        Sets each player's stack value from the OCR of their stack region.
+
+        Args:
+            stack_texts (list[str | None]): For each player, the text read in the stack crop,
+                                            or None if no stack was detected.
+
+        Returns:
+            None
+        """
+        for player, text in zip(self.players, stack_texts):
+            player.stack = text or ''
+
+
+    def get_bet_crops(self, present_player_indices: list[int]) -> list[NDArray[numpy.uint8]]:
         """
         Returns cropped image regions for each present player's betting area.
 
@@ -472,7 +620,7 @@ class PokerState:
             present_player_indices (list[int]): Indices of players currently active (excluding Player 1).
 
         Returns:
-            list[Image]: List of cropped bet zones matching the order of present players.
+            list[NDArray[numpy.uint8]]: List of cropped bet zones matching the order of present players.
         """
         bet_crops = []
 
@@ -484,22 +632,22 @@ class PokerState:
         return bet_crops
 
 
-    def get_bets(self, bet_crops: list[Image]) -> list[Image | None]:
+    def get_bets(self, bet_crops: list[NDArray[numpy.uint8]]) -> list[NDArray[numpy.uint8] | None]:
         """
         Detects which bet zones contain a yellow bet value and returns the matching crops.
 
         Args:
-            bet_crops (list[Image]): List of cropped images of bet areas for present players.
+            bet_crops (list[NDArray[numpy.uint8]]): List of cropped images of bet areas for present players.
 
         Returns:
-            list[Image | None]: A list where each element is either the original crop (if a bet is detected)
-                                or None (if no bet is present). Matches the order of input crops.
+            list[NDArray[numpy.uint8] | None]: A list where each element is either the crop narrowed to the bet text
+                                (if a bet is detected) or None (if no bet is present). Matches the order of input crops.
         """
         bets = []
 
         for crop in bet_crops:
             has_bet = self.has_yellow_bet(crop)
-            bet_crop = crop if has_bet else None
+            bet_crop = self.narrow_to_text(crop, self.bet_text_color) if has_bet else None
             bets.append(bet_crop)
 
         return bets
@@ -507,35 +655,25 @@ class PokerState:
     def set_bet_values(
         self,
         present_player_indices: list[int],
-        bet_crops: list[Image],
-        bets: list[Image | None]
+        bet_texts: list[Optional[str]]
     ) -> None:
         """
         Sets the textual bet amount for each present player based on OCR.
 
         Args:
             present_player_indices (list[int]): Indices of active players (excluding Player 1).
-            bet_crops (list[Image]): Cropped bet regions corresponding to the present players.
-            bets (list[bool]): Flags indicating whether a bet was detected for each player.
+            bet_texts (list[str | None]): For each present player, the text read in the bet crop,
+                                          or None if no bet was detected.
 
         Returns:
             None
         """
-        for index, bet in enumerate(bets):
-            present_player_index = present_player_indices[index]
+        for present_player_index, text in zip(present_player_indices, bet_texts):
             player = self.players[present_player_index]
+            player.bet_amount = text or ''
 
-            if bet:
-                bet_crop = bet_crops[index]
-                bet_crop_arr = numpy.array(bet_crop)
-                bet_amount = self.ocr_reader.readtext(bet_crop_arr)
-            else:
-                bet_amount = ''
 
-            player.bet_amount = bet_amount
-
-
-    def get_cards_back_presence(self) -> list[numpy.bool_]:
+    def get_cards_back_presence(self) -> list[bool]:
         """
         Checks whether each player (from seat 2 to 5) has unfolded cards
         based on the presence of card back patterns.
@@ -551,18 +689,28 @@ class PokerState:
 
         return results
 
-    def set_players_presence_from_stack(self) -> None:
+    def set_players_presence_from_stack(
+        self,
+        stack_crops: list[Optional[NDArray[numpy.uint8]]],
+        all_in_flags: list[bool]
+    ) -> None:
         """
-        Updates each player's presence status based on whether a stack value exists.
+        Updates each player's presence status and all-in flag based on what was detected in their stack region.
 
-        A player is marked as "present" if a stack value is set (non-empty),
-        otherwise marked as "absent".
+        A player is marked as "present" if a stack value or the ALL-IN label is detected
+        in their stack region (see `get_stack_crops`), otherwise marked as "absent".
+
+        Args:
+            stack_crops (list[NDArray[numpy.uint8] | None]): For each player, the stack crop if a stack
+                                                             value is detected, None otherwise.
+            all_in_flags (list[bool]): For each player, whether the ALL-IN label is detected.
 
         Returns:
             None
         """
-        for player in self.players:
-            player.presence = "present" if player.stack else "absent"
+        for player, stack_crop, all_in in zip(self.players, stack_crops, all_in_flags):
+            player.has_all_in = all_in
+            player.presence = "present" if stack_crop is not None or all_in else "absent"
 
     def set_player_positions(
         self,
@@ -608,8 +756,8 @@ class PokerState:
     def get_move(
         self,
         player_index: int,
-        bet: Optional[Image],
-        cards_back: numpy.bool_,
+        bet: Optional[NDArray[numpy.uint8]],
+        cards_back: bool,
         dealer_index: int,
         present_player_indices: list[int]
     ) -> str:
@@ -622,7 +770,7 @@ class PokerState:
 
         Args:
             player_index (int): Index of the player being evaluated.
-            bet (Image | None): Cropped bet image if a bet was detected, otherwise None.
+            bet (NDArray[numpy.uint8] | None): Cropped bet image if a bet was detected, otherwise None.
             cards_back (bool): Whether the player has cards visible (i.e., not folded).
             dealer_index (int): Index of the dealer.
             present_player_indices (list[int]): List of all present players' indices 
@@ -656,15 +804,15 @@ class PokerState:
     def _move_from_state(
         self,
         player_index: int,
-        bet: Optional[Image],
-        cards_back: numpy.bool_
+        bet: Optional[NDArray[numpy.uint8]],
+        cards_back: bool
     ) -> str:
         """
         Infers the move of a player based on whether a bet or cards are detected.
 
         Args:
             player_index (int): Index of the player to evaluate.
-            bet (Image | None): Bet image if detected, otherwise None.
+            bet (NDArray[numpy.uint8] | None): Bet image if detected, otherwise None.
             cards_back (bool): True if player has not folded (cards still shown).
 
         Returns:
@@ -688,25 +836,13 @@ class PokerState:
         Returns:
             str: Encoded representation — e.g., 'B', 'C', 'F', 'NP', 'B-ALLIN', or 'unknown'.
         """
-        if move == "all-in":
-            move = "B-ALLIN"
-        elif move == "bet":
-            code = "B"
-        elif move == "check":
-            code = "C"
-        elif move == "fold":
-            code = "F"
-        elif move == "NP":
-            code = "NP"
-        else:
-            code = "unknown"
-        return code
+        return self.move_codes.get(move, "unknown")
 
     def set_players_moves(
         self,
-        bets: list[Image | None],
+        bets: list[NDArray[numpy.uint8] | None],
         present_player_indices: list[int],
-        cards_back_flags: list[numpy.bool_],
+        cards_back_flags: list[bool],
         dealer_index: int
     ) -> None:
         """
@@ -719,7 +855,7 @@ class PokerState:
         - If absent, their move is explicitly set to 'absent'.
 
         Args:
-            bets (list[Image | None]): Detected bet crops (or None) for each present player (excluding Player 1).
+            bets (list[NDArray[numpy.uint8] | None]): Detected bet crops (or None) for each present player (excluding Player 1).
             present_player_indices (list[int]): Indices of currently active players (excluding Player 1).
             cards_back_flags (list[bool]): Whether each player has visible cards (unfolded).
             dealer_index (int): Index of the player with the dealer button.
@@ -750,27 +886,24 @@ class PokerState:
                 player.move = 'absent'
     
     # FIXME: handle fail of ocr and hence modify type 
-    def get_pot_values(self, pot_crop: Image) -> tuple[str, str]:
+    def get_pot_values(self, pot_values: list[str]) -> tuple[str, str]:
         """
-        Extracts the pot and pot total values from a cropped image of the pot area.
+        Extracts the pot and pot total values from the texts read in the pot area.
 
-        Uses OCR to read text from the cropped region. If two values are found,
-        they are assumed to be [pot, pot_total]. If only one value is found, it is assumed
-        to be the current pot, and pot_total is returned as an empty string.
+        If two values are found, they are assumed to be [pot, pot_total]. If only one value
+        is found, it is assumed to be the current pot, and pot_total is returned as an empty string.
 
         Args:
-            pot_crop (Image): Cropped image of the pot value display.
+            pot_values (list[str]): Texts read by OCR in the pot region (pot and/or pot total).
 
         Returns:
             tuple[str, str]: A tuple containing (pot, pot_total).
         """
         pot, pot_total = '', ''
-        pot_crop_arr = numpy.array(pot_crop)
-        pot_values = self.ocr_reader.readtext(pot_crop_arr, detail=0)  # value(s) for pot and/or pot total
 
         if len(pot_values) == 2:
             pot, pot_total = pot_values
-        else:
+        elif pot_values:
             pot = pot_values[0]
 
         return pot, pot_total
@@ -793,33 +926,38 @@ class PokerState:
                 including move, position, stack, and optionally cards and bet.
                 - table_data: A single dict containing the game phase, table cards, and pot amounts.
         """
-        start = time.time()
+        if self.debug_timing:
+            start = time.perf_counter_ns()
+
         # === Detected table cards === 
         table_cards_block = self.extract_table_cards()
         if table_cards_block:
             self.preflop = False
 
         # === Players presence based on stack ===
-        self.set_player_stacks()
-        self.set_players_presence_from_stack() 
+        stack_crops, all_in_flags = self.get_stack_crops()
+        self.set_players_presence_from_stack(stack_crops, all_in_flags) 
         present_player_indices = [player.index for player in self.players 
                                   if player.presence == 'present' and player.index != 0]
 
-        # === Pot ===
-        pot_crop = self.crop_region(self.pot_region)
-        pot, pot_total = self.get_pot_values(pot_crop)
         # === Cards back presence (for players other than player 1 that has not folded) ===
         cards_back_crops = self.get_cards_back_presence()
 
         # === Bets ===
         bet_crops = self.get_bet_crops(present_player_indices)
         bets = self.get_bets(bet_crops)
-        self.set_bet_values(present_player_indices, 
-                            bet_crops, 
-                            bets)
+
+        # === OCR of stacks and bets (recognizer only, in a single batch), and of the pot ===
+        stack_texts, bet_texts = self.recognize_texts(stack_crops, bets)
+        pot_crop = self.crop_region(self.pot_region)
+        pot_texts = self.ocr_reader.readtext(pot_crop, detail=0)
+        self.set_player_stacks(stack_texts)
+        self.set_bet_values(present_player_indices, bet_texts)
+        pot, pot_total = self.get_pot_values(pot_texts)
 
         # === Players positions ===
         dealer_index = self.get_dealer_index()
+        self.dealer_index = dealer_index
         all_present_player_indices = [0] + present_player_indices
         self.set_player_positions(dealer_index, 
                                   all_present_player_indices)
@@ -847,29 +985,21 @@ class PokerState:
 
         for player_index in range(self.max_nb_players):
             player = self.players[player_index]
-            message = []
 
             if player.presence == "absent":
-                status = "absent"
-                text_msg = f"Player {player.index + 1} - Status: {status}"
-                message.append({"type": "text", "text": text_msg})
-                player_data.append({"role": "user", "content": message})
+                text_msg = self.absent_player_template % (player.index + 1)
+                player_data.append({"role": "user", "content": [{"type": "text", "text": text_msg}]})
                 continue
 
             # Present player
-            status = "present"
             assert player.move is not None, "if player is present, move must not be None"
-            move_code = self._encode_move(player.move)
-            position = player.position
-
-            text_parts = [f"Player {player.index + 1}", f"Status: {status}"]
-            if player_index != 0:
-                text_parts.append(f"Move: {move_code}")
-            
-            text_parts.append(f"Position: {position}")
+            if player_index == 0:
+                text_msg = self.hero_player_template % (player.index + 1, player.position)
+            else:
+                move_code = self._encode_move(player.move)
+                text_msg = self.other_player_template % (player.index + 1, move_code, player.position)
 
-            text_msg = " - ".join(text_parts)
-            message.append({"type": "text", "text": text_msg})
+            message = [{"type": "text", "text": text_msg}]
 
             # === Stack value (text only, unless all-in) ===
             if not player.has_all_in and player.stack:
@@ -886,9 +1016,9 @@ class PokerState:
                 message.append({"type": "text", "text": f"Player1 cards: {card_text}"})
 
             player_data.append({"role": "user", "content": message})
-        end = time.time()
-        elapsed_time = end - start
-        print(f"Elasped time local processing : {elapsed_time}")
+        if self.debug_timing:
+            elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+            print(f"Elapsed time local processing : {elapsed_ms:.2f} ms")
 
         return player_data, table_data
     
\ No newline at end of file
@@ -3,10 +3,11 @@ import sys
 # === Fix path and initialize objects ===
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from PIL import Image
+import cv2
+import numpy
 from prepare_data import PokerState
 from openai import OpenAI
-import easyocr
+from ocr_interface import create_ocr_reader
 
 _SCREENSHOT_TEST_PATH = "handscreenshots/9.jpeg" # NOTE: Update to screenshot path of your choice.
 # Path might depend on where (which directory) you execute the code from. Here it was executed from
@@ -31,8 +32,11 @@ def test_pokerstate_image_analysis() -> None:
     Raises:
         Any unexpected exceptions from internal PokerState methods are caught and printed.
     """
-    img = Image.open(_SCREENSHOT_TEST_PATH)
-    reader = easyocr.Reader(['en'], gpu=True)
+    img_bgr = cv2.imread(_SCREENSHOT_TEST_PATH)
+    if img_bgr is None:
+        raise FileNotFoundError(f"Screenshot not found: {_SCREENSHOT_TEST_PATH}")
+    img = numpy.asarray(cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB), dtype=numpy.uint8)
+    reader = create_ocr_reader(gpu=True)
 
     state = PokerState(image=img, ocr_reader=reader)
 
@@ -49,9 +53,11 @@ def test_pokerstate_image_analysis() -> None:
     dealer = state.get_dealer_index()
     print(f"Dealer: Player {dealer + 1}")
 
-    print("\n[TEST] set_player_stacks + player.presence")
-    state.set_player_stacks()
-    state.set_players_presence_from_stack()
+    print("\n[TEST] get_stack_crops + set_player_stacks + player.presence")
+    stack_crops, all_in_flags = state.get_stack_crops()
+    state.set_players_presence_from_stack(stack_crops, all_in_flags)
+    stack_texts, = state.recognize_texts(stack_crops)
+    state.set_player_stacks(stack_texts)
     for p in state.players:
         print(f"Player {p.index + 1} present: {p.presence}, stack: {p.stack}, all-in: {p.has_all_in}")
 
@@ -60,7 +66,7 @@ def test_pokerstate_image_analysis() -> None:
     bet_crops = state.get_bet_crops(present)
     bets = state.get_bets(bet_crops)
     for i, bet in zip(present, bets):
-        print(f"Player {i + 1}: {'bet' if bet else 'no bet'}")
+        print(f"Player {i + 1}: {'bet' if bet is not None else 'no bet'}")
 
     print("\n[TEST] extract_player1_cards")
     try:
@@ -0,0 +1,37 @@
+"""
+One-shot conversion of boolean card masks (.npy, shape (N, H, W)) into
+bit-packed masks (.npz) as loaded by constants.py.
+
+Usage (from the Winadim folder):
+    python tools/pack_masks.py card_rank_masks.npy constants_data/card_rank_masks.npz
+"""
+import argparse
+import numpy
+from pathlib import Path
+
+def pack_masks(input_path: Path, output_path: Path) -> None:
+    """
+    Loads a (N, H, W) boolean mask array, packs each mask into bits and saves
+    the result along with the original shape.
+
+    The output .npz contains:
+        - packed: uint8 array of shape (N, ceil(H*W / 8)).
+        - shape: int array holding the original (N, H, W) shape.
+
+    Args:
+        input_path (Path): Path of the .npy file holding the boolean masks.
+        output_path (Path): Path of the .npz file to write.
+    """
+    masks = numpy.load(input_path, allow_pickle=False)
+    assert masks.ndim == 3 and masks.dtype == numpy.bool_, "Expected a (N, H, W) boolean array."
+
+    packed = numpy.packbits(masks.reshape(len(masks), -1), axis=1)
+    numpy.savez(output_path, packed=packed, shape=numpy.array(masks.shape))
+    print(f"{input_path} ({masks.nbytes} bytes) -> {output_path} ({packed.nbytes} bytes)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack boolean card masks into bits.")
+    parser.add_argument("input", type=Path, help="Input .npy file of shape (N, H, W).")
+    parser.add_argument("output", type=Path, help="Output .npz file.")
+    args = parser.parse_args()
+    pack_masks(args.input, args.output)
@@ -0,0 +1,219 @@
+import numba
+import numpy
+from numba import types
+from numba.extending import intrinsic
+from numpy.typing import NDArray
+
+# === Signatures of the kernels compiled at import time ===
+# Crops are views (non-contiguous) on the screenshot, which is read-only when it comes from PIL.
+# Writable and contiguous arrays convert to these read-only types, so one variant per dtype is enough.
+_RGB_CROP_TYPE = types.Array(types.uint8, 3, 'A', readonly=True)
+_ROW_LIMITS_TYPE = types.Array(types.intp, 1, 'C', readonly=True)
+_REFERENCE_TYPES = (types.Array(types.uint64, 2, 'C', readonly=True), types.Array(types.uint8, 2, 'C', readonly=True))
+_COUNTS_TYPE = types.Array(types.intp, 1, 'C', readonly=True)
+
+_COUNT_IN_BOX_SIGNATURES = [types.intp(_RGB_CROP_TYPE, *[types.intp] * 7)]
+_TEXT_SPAN_IN_BOX_SIGNATURES = [types.UniTuple(types.intp, 2)(_RGB_CROP_TYPE, *[types.intp] * 7)]
+_MATCH_RGB_INK_SIGNATURES = [
+    types.UniTuple(types.intp, 2)(_RGB_CROP_TYPE, types.intp, _ROW_LIMITS_TYPE, reference, _COUNTS_TYPE)
+    for reference in _REFERENCE_TYPES
+]
+
+@numba.njit(_COUNT_IN_BOX_SIGNATURES, cache=True)
+def count_in_box(arr: NDArray[numpy.uint8],
+                 r_lo: int, r_hi: int,
+                 g_lo: int, g_hi: int,
+                 b_lo: int, b_hi: int,
+                 limit: int) -> int:
+    """
+    Counts the pixels of an RGB image whose channels all lie in the given (inclusive) box,
+    in a single pass and without any temporary mask.
+
+    The scan stops as soon as the count exceeds `limit`, since callers only compare it
+    against that threshold. It is compiled (or loaded from the cache) at import time.
+
+    Args:
+        arr (NDArray[numpy.uint8]): Image array of shape (H, W, 3).
+        r_lo, r_hi (int): Bounds of the red channel.
+        g_lo, g_hi (int): Bounds of the green channel.
+        b_lo, b_hi (int): Bounds of the blue channel.
+        limit (int): Count above which the scan stops early.
+
+    Returns:
+        int: The number of pixels in the box, or `limit + 1` if it exceeds `limit`.
+    """
+    count = 0
+    for y in range(arr.shape[0]):
+        for x in range(arr.shape[1]):
+            r = arr[y, x, 0]
+            if r < r_lo or r > r_hi:
+                continue
+            g = arr[y, x, 1]
+            if g < g_lo or g > g_hi:
+                continue
+            b = arr[y, x, 2]
+            if b_lo <= b <= b_hi:
+                count += 1
+                if count > limit:
+                    return count
+    return count
+
+@numba.njit(_TEXT_SPAN_IN_BOX_SIGNATURES, cache=True)
+def text_span_in_box(arr: NDArray[numpy.uint8],
+                     r_lo: int, r_hi: int,
+                     g_lo: int, g_hi: int,
+                     b_lo: int, b_hi: int,
+                     max_gap: int) -> tuple[int, int]:
+    """
+    Finds the widest group of columns of an RGB image containing pixels in the given (inclusive) box.
+
+    Columns with at least one pixel in the box belong to the same group when they are separated
+    by at most `max_gap` columns without any. It is compiled (or loaded from the cache) at import time.
+
+    Args:
+        arr (NDArray[numpy.uint8]): Image array of shape (H, W, 3).
+        r_lo, r_hi (int): Bounds of the red channel.
+        g_lo, g_hi (int): Bounds of the green channel.
+        b_lo, b_hi (int): Bounds of the blue channel.
+        max_gap (int): Largest number of consecutive empty columns inside a group.
+
+    Returns:
+        tuple[int, int]: The (start, stop) columns of the widest group, or (0, 0) if no pixel is in the box.
+    """
+    best_start, best_stop = 0, 0
+    start, stop = -1, -1
+    for x in range(arr.shape[1]):
+        found = False
+        for y in range(arr.shape[0]):
+            r = arr[y, x, 0]
+            g = arr[y, x, 1]
+            b = arr[y, x, 2]
+            if r_lo <= r <= r_hi and g_lo <= g <= g_hi and b_lo <= b <= b_hi:
+                found = True
+                break
+        if not found:
+            continue
+        if start < 0 or x - stop > max_gap:
+            start = x
+        stop = x + 1
+        if stop - start > best_stop - best_start:
+            best_start, best_stop = start, stop
+    return best_start, best_stop
+
+@numba.njit(cache=True)
+def pack_rgb_ink(arr: NDArray,
+                 threshold: int,
+                 row_limits: NDArray[numpy.intp],
+                 out: NDArray[numpy.uint8]) -> None:
+    """
+    Thresholds the RGB channel sums of an image and packs the resulting ink mask into bits,
+    in a single pass.
+
+    The layout matches `numpy.packbits` on the flattened mask (row-major, most significant
+    bit first). Row `y` is left blank up to column `row_limits[y]`, which is equivalent to
+    zeroing the top-left triangle of the image beforehand.
+
+    Args:
+        arr (NDArray): Image array of shape (H, W, 3).
+        threshold (int): Pixels whose channel sum is greater than it are ink.
+        row_limits (NDArray[numpy.intp]): Number of pixels to leave blank on each of the first rows.
+        out (NDArray[numpy.uint8]): Preallocated output array of shape (ceil(H * W / 8),).
+    """
+    out[:] = 0
+    w = arr.shape[1]
+    for y in range(arr.shape[0]):
+        start = row_limits[y] if y < row_limits.shape[0] else 0
+        for x in range(start, w):
+            if arr[y, x, 0] + arr[y, x, 1] + arr[y, x, 2] > threshold:
+                bit = y * w + x
+                out[bit >> 3] |= 0x80 >> (bit & 7)
+
+@intrinsic
+def popcount(typingctx, value):
+    """
+    Counts the set bits of an integer, compiled to LLVM's `ctpop` intrinsic
+    (a single POPCNT instruction on x86). Only callable from jitted code.
+    """
+    if not isinstance(value, types.Integer):
+        return None
+
+    def codegen(context, builder, signature, args):
+        return builder.ctpop(args[0])
+
+    return value(value), codegen
+
+@numba.njit(cache=True)
+def argmin_hamming(input_packed: NDArray[numpy.unsignedinteger],
+                   reference_packed: NDArray[numpy.unsignedinteger],
+                   reference_counts: NDArray[numpy.intp]
+                   ) -> tuple[int, int]:
+    """
+    Finds the bit-packed reference mask closest to the input one in Hamming distance.
+
+    Mismatch counts are accumulated with a running minimum instead of being
+    materialized: a reference stops being scanned as soon as it cannot beat the
+    best one, and the search stops on a perfect match. References whose number of
+    set pixels differs from the input's by at least the best count are skipped
+    without being scanned, since that difference is a lower bound of the distance.
+
+    Args:
+        input_packed (NDArray[numpy.unsignedinteger]): Packed input mask of shape (B,), in bytes or words.
+        reference_packed (NDArray[numpy.unsignedinteger]): Packed reference masks of shape (N, B), same dtype.
+        reference_counts (NDArray[numpy.intp]): Number of set pixels of each reference mask, of shape (N,).
+
+    Returns:
+        tuple[int, int]: The index of the first reference with the fewest mismatches,
+                         and its number of mismatching pixels.
+    """
+    input_count = 0
+    for j in range(input_packed.shape[0]):
+        input_count += popcount(input_packed[j]) # type: ignore[call-arg]
+
+    best_index = -1
+    best_count = input_packed.shape[0] * input_packed.itemsize * 8 + 1
+    for i in range(reference_packed.shape[0]):
+        if abs(input_count - reference_counts[i]) >= best_count:
+            continue
+        count = 0
+        for j in range(reference_packed.shape[1]):
+            count += popcount(input_packed[j] ^ reference_packed[i, j]) # type: ignore[call-arg]
+            if count >= best_count:
+                break
+        if count < best_count:
+            best_index = i
+            best_count = count
+            if count == 0:
+                break
+    return best_index, best_count
+
+@numba.njit(_MATCH_RGB_INK_SIGNATURES, cache=True)
+def match_rgb_ink(arr: NDArray,
+                  threshold: int,
+                  row_limits: NDArray[numpy.intp],
+                  reference_packed: NDArray[numpy.unsignedinteger],
+                  reference_counts: NDArray[numpy.intp]
+                  ) -> tuple[int, int]:
+    """
+    Packs the ink mask of an RGB image and finds the closest reference mask, in a single call.
+
+    Like `count_in_box`, it is compiled (or loaded from the cache) at import time for the crop
+    and reference types used by `PokerState`, so that the first analysis pays no JIT latency.
+
+    The input is packed into bytes, then viewed with the dtype of the references, so that
+    references regrouped into 64-bit words are compared a word at a time.
+
+    Args:
+        arr (NDArray): Image array of shape (H, W, 3).
+        threshold (int): Pixels whose channel sum is greater than it are ink.
+        row_limits (NDArray[numpy.intp]): Number of pixels to leave blank on each of the first rows.
+        reference_packed (NDArray[numpy.unsignedinteger]): Packed reference masks of shape (N, B),
+                                                           in bytes or in zero-padded words.
+        reference_counts (NDArray[numpy.intp]): Number of set pixels of each reference mask, of shape (N,).
+
+    Returns:
+        tuple[int, int]: The index of the first reference with the fewest mismatches,
+                         and its number of mismatching pixels.
+    """
+    input_bytes = numpy.empty(reference_packed.shape[1] * reference_packed.itemsize, dtype=numpy.uint8)
+    pack_rgb_ink(arr, threshold, row_limits, input_bytes)
+    return argmin_hamming(input_bytes.view(reference_packed.dtype), reference_packed, reference_counts)